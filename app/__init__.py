@@ -1,3 +1,10 @@
-from .main import app
+__all__ = ["app"]
 
-__all__ = ["app"]
\ No newline at end of file
+
+def __getattr__(name):
+    # Import the application lazily so scripts that only need app.models
+    # don't run the whole FastAPI startup
+    if name == "app":
+        from .main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -105,7 +105,7 @@ async def upload_receipt_with_ocr(
     
     if not validate_file_size(file):
         raise HTTPException(
-            status_code=400,
+            status_code=413,
             detail=f"File too large. Maximum size is {settings.max_file_size} bytes."
         )
     
@@ -137,6 +137,8 @@ async def upload_receipt_with_ocr(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -169,7 +171,7 @@ async def process_expense_form_image(
     
     if not validate_file_size(file):
         raise HTTPException(
-            status_code=400,
+            status_code=413,
             detail=f"File too large. Maximum size is {settings.max_file_size} bytes."
         )
     
@@ -247,6 +249,8 @@ async def process_expense_form_image(
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
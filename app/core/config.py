@@ -26,6 +26,9 @@ class Settings(BaseSettings):
     upload_dir: str = "/tmp/uploads" if os.getenv("ENVIRONMENT") == "production" else "uploads"
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     
+    # OCR settings
+    category_model_path: str = ""  # ONNX model built by train_category_model.py
+    
     # Email settings
     smtp_server: str = "smtp.gmail.com"
     smtp_port: int = 587
@@ -1,11 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index, Numeric, Enum as SQLEnum
+from sqlalchemy.orm import DeclarativeBase, relationship
 import enum
-from datetime import datetime
+from datetime import datetime, timezone
 
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
+
+def _utcnow():
+    """Timestamp default, set in Python so SQLite doesn't round-trip CURRENT_TIMESTAMP text"""
+    return datetime.now(timezone.utc)
+
+def rel(*args, **kwargs):
+    """relationship() that raises on lazy load unless told otherwise"""
+    # Use for new relationships so N+1 access fails loudly; load them with
+    # selectinload()/joinedload() at the query instead
+    kwargs.setdefault("lazy", "raise")
+    return relationship(*args, **kwargs)
 
 class UserRole(str, enum.Enum):
     ADMIN = "admin"
@@ -31,15 +41,25 @@ class ApprovalRuleType(str, enum.Enum):
     SPECIFIC_APPROVER = "specific_approver"
     HYBRID = "hybrid"
 
+# _MONEY is stored as exact DECIMAL; asdecimal=False keeps handing floats to the
+# API and currency code, which work in floats
+_MONEY = Numeric(12, 2, asdecimal=False)
+
+def _enum_type(enum_class, name):
+    """VARCHAR plus a CHECK constraint instead of a native ENUM type"""
+    # Members are still stored by name, so rows written with the old native
+    # enum columns read back unchanged
+    return SQLEnum(enum_class, native_enum=False, create_constraint=True, length=32, name=name)
+
 class Company(Base):
     __tablename__ = "companies"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     country = Column(String(100), nullable=False)
     currency = Column(String(3), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     # Relationships
     users = relationship("User", back_populates="company")
@@ -49,18 +69,21 @@ class Company(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_user_company_role", "company_id", "role"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
-    role = Column(SQLEnum(UserRole), default=UserRole.EMPLOYEE)
+    role = Column(_enum_type(UserRole, "ck_user_role"), default=UserRole.EMPLOYEE)
     is_active = Column(Boolean, default=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     # Relationships - Fixed the overlap issue
     company = relationship("Company", back_populates="users")
@@ -77,23 +100,28 @@ class User(Base):
 
 class Expense(Base):
     __tablename__ = "expenses"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
+    __table_args__ = (
+        # Pending-approval listings and per-employee date ranges
+        Index("ix_expense_company_status", "company_id", "status"),
+        Index("ix_expense_employee_date", "employee_id", "expense_date"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    amount = Column(_MONEY, nullable=False)
     currency = Column(String(3), nullable=False)
-    category = Column(SQLEnum(ExpenseCategory), nullable=False)
+    category = Column(_enum_type(ExpenseCategory, "ck_expense_category"), nullable=False)
     description = Column(Text, nullable=False)
     expense_date = Column(DateTime, nullable=False)
     receipt_url = Column(String(500), nullable=True)
-    status = Column(SQLEnum(ExpenseStatus), default=ExpenseStatus.PENDING)
-    amount_in_company_currency = Column(Float, nullable=False)
+    status = Column(_enum_type(ExpenseStatus, "ck_expense_status"), default=ExpenseStatus.PENDING)
+    amount_in_company_currency = Column(_MONEY, nullable=False)
     
     # Foreign Keys
     employee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     # Relationships
     employee = relationship("User", foreign_keys=[employee_id], back_populates="submitted_expenses")
@@ -102,16 +130,19 @@ class Expense(Base):
 
 class Approval(Base):
     __tablename__ = "approvals"
+    __table_args__ = (
+        Index("ix_approval_expense_status", "expense_id", "status"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=False)
     approver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    status = Column(SQLEnum(ExpenseStatus), default=ExpenseStatus.PENDING)
+    status = Column(_enum_type(ExpenseStatus, "ck_approval_status"), default=ExpenseStatus.PENDING)
     sequence = Column(Integer, default=1)
     comments = Column(Text, nullable=True)
     approved_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     # Relationships
     expense = relationship("Expense", back_populates="approvals")
@@ -120,17 +151,17 @@ class Approval(Base):
 class ApprovalRule(Base):
     __tablename__ = "approval_rules"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
-    rule_type = Column(SQLEnum(ApprovalRuleType), nullable=False)
-    min_amount = Column(Float, nullable=True)
-    max_amount = Column(Float, nullable=True)
-    percentage_required = Column(Float, nullable=True)
+    rule_type = Column(_enum_type(ApprovalRuleType, "ck_approval_rule_type"), nullable=False)
+    min_amount = Column(_MONEY, nullable=True)
+    max_amount = Column(_MONEY, nullable=True)
+    percentage_required = Column(Numeric(5, 2, asdecimal=False), nullable=True)
     specific_approver_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     is_active = Column(Boolean, default=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     # Relationships
     company = relationship("Company", back_populates="approval_rules")
@@ -140,11 +171,11 @@ class ApprovalRule(Base):
 class ApprovalRuleApprover(Base):
     __tablename__ = "approval_rule_approvers"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     rule_id = Column(Integer, ForeignKey("approval_rules.id"), nullable=False)
     approver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     sequence = Column(Integer, default=1)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
     
     # Relationships
     rule = relationship("ApprovalRule", back_populates="rule_approvers")
@@ -153,13 +184,13 @@ class ApprovalRuleApprover(Base):
 class Category(Base):
     __tablename__ = "categories"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     # Relationships
     company = relationship("Company", back_populates="categories")
\ No newline at end of file
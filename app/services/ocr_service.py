@@ -4,8 +4,208 @@ import numpy as np
 from PIL import Image
 import re
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import os
+from ..core.config import settings
+
+try:
+    import ahocorasick
+except ImportError:
+    # Without pyahocorasick, categories fall back to per-keyword substring checks
+    ahocorasick = None
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    # The ONNX category model is optional; keyword rules are used without it
+    ort = None
+
+def _compile_patterns(*patterns: str) -> List[re.Pattern]:
+    """Compile case-insensitive patterns once at import time"""
+    return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+# Currency amounts for extract_amount, tried in order
+_CURRENCY_PATTERNS = _compile_patterns(
+    r'[\$£€¥₹]\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # $123.45, £1,234.56
+    r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*[\$£€¥₹]',  # 123.45$
+    r'(?:total|amount|sum|price|cost)[\s:]*[\$£€¥₹]?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Total: $123.45
+    r'(\d+(?:,\d{3})*\.\d{2})'  # Generic decimal number
+)
+
+# Receipt dates for extract_date, tried in order
+_DATE_PATTERNS = _compile_patterns(
+    r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',  # MM/DD/YYYY, DD/MM/YYYY
+    r'(\d{2,4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})',  # YYYY/MM/DD
+    r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})',  # DD Month YYYY
+    r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{2,4})'  # Month DD, YYYY
+)
+
+# Expense form field patterns, each list tried in order
+_FORM_DESCRIPTION_PATTERNS = _compile_patterns(
+    r'description[\s:]*([^\n\r]+)',
+    r'desc[\s:]*([^\n\r]+)',
+    r'item[\s:]*([^\n\r]+)',
+    r'expense[\s:]*([^\n\r]+)'
+)
+_FORM_DATE_PATTERNS = _compile_patterns(
+    r'expense\s+date[\s:]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
+    r'date[\s:]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
+    r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
+    r'(\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{2,4})',
+    r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2},?\s+\d{2,4})'
+)
+_FORM_CATEGORY_PATTERNS = _compile_patterns(
+    r'category[\s:]*([^\n\r]+)',
+    r'cat[\s:]*([^\n\r]+)',
+    r'type[\s:]*([^\n\r]+)'
+)
+_FORM_PAID_BY_PATTERNS = _compile_patterns(
+    r'paid\s+by[\s:]*([^\n\r]+)',
+    r'paidby[\s:]*([^\n\r]+)',
+    r'payment\s+method[\s:]*([^\n\r]+)',
+    r'paid[\s:]*([^\n\r]+)'
+)
+_FORM_REMARKS_PATTERNS = _compile_patterns(
+    r'remarks[\s:]*([^\n\r]+)',
+    r'notes[\s:]*([^\n\r]+)',
+    r'comment[\s:]*([^\n\r]+)',
+    r'memo[\s:]*([^\n\r]+)'
+)
+
+# Merchant name cleanup
+_NUMERIC_LINE = re.compile(r'^\d+[\s\d\-\/\.]*$')
+_RECEIPT_TERMS = re.compile(r'(receipt|bill|invoice|tax|gst|vat)', re.IGNORECASE)
+
+# Total amount patterns, tried in order
+_AMOUNT_PATTERNS = _compile_patterns(
+    r'total\s+amount[\s:]*(\d+(?:,\d{3})*(?:\.\d{2})?)\s*([a-z]{3})',  # "567 USD"
+    r'total\s+amount[\s:]*([a-z]{3})\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # "USD 567"
+    r'amount[\s:]*(\d+(?:,\d{3})*(?:\.\d{2})?)\s*([a-z]{3})',  # "567 USD"
+    r'amount[\s:]*([a-z]{3})\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # "USD 567"
+    r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*([a-z]{3})',  # Generic "567 USD"
+    r'([a-z]{3})\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Generic "USD 567"
+    r'[\$£€¥₹]\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Symbol-based currencies
+    r'(\d+(?:,\d{3})*\.\d{2})'  # Generic decimal number
+)
+
+# Keywords marking lines that usually carry the receipt total
+_AMOUNT_ANCHORS = frozenset({'total', 'amount', 'sum', 'subtotal', 'grand'})
+_WORD_SPLIT = re.compile(r'[^a-z]+')
+
+# Expense category keywords, in priority order
+_CATEGORY_KEYWORDS = (
+    ("Food & Dining", ('restaurant', 'cafe', 'coffee', 'food', 'dining', 'meal', 'lunch', 'dinner', 'breakfast')),
+    ("Transportation", ('taxi', 'uber', 'lyft', 'bus', 'train', 'flight', 'airline', 'parking', 'fuel', 'gas')),
+    ("Office Supplies", ('office', 'supplies', 'stationery', 'paper', 'pen', 'printer')),
+    ("Accommodation", ('hotel', 'motel', 'accommodation', 'lodging', 'stay')),
+)
+
+def _build_category_automaton():
+    """Build an Aho-Corasick automaton mapping keywords to (priority, category)"""
+    automaton = ahocorasick.Automaton()
+    for priority, (category, keywords) in enumerate(_CATEGORY_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, (priority, category))
+    automaton.make_automaton()
+    return automaton
+
+_CATEGORY_AUTOMATON = _build_category_automaton() if ahocorasick is not None else None
+
+def _parse_amount(value: str) -> Optional[float]:
+    """Parse a single matched amount string"""
+    cleaned = value.replace(',', '').strip()
+    if not cleaned.replace('.', '', 1).isdigit():
+        return None
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+def _parse_amounts(values: List[str]) -> List[Optional[float]]:
+    """Parse matched amount strings"""
+    return [_parse_amount(value) for value in values]
+
+def _select_amount(matches: list) -> Tuple[Optional[float], Optional[str]]:
+    """Return the first parseable (amount, currency) pair from findall results"""
+    pairs = [match if isinstance(match, tuple) else (match, "") for match in matches]
+    parsed = _parse_amounts([group for pair in pairs for group in pair])
+    
+    for i, (first, second) in enumerate(pairs):
+        if parsed[2 * i] is not None:
+            # First is amount, second is currency
+            return parsed[2 * i], second.upper() or None
+        if parsed[2 * i + 1] is not None:
+            # First is currency, second is amount
+            return parsed[2 * i + 1], first.upper()
+    
+    return None, None
+
+# Keyword-anchored "total amount"/"amount" patterns; the generic ones that follow
+# them in _AMOUNT_PATTERNS are only used for the full-text fallback
+_ANCHORED_AMOUNT_PATTERNS = _AMOUNT_PATTERNS[:4]
+
+# Anchor words marking the final total, tried before subtotal/sum lines
+_TOTAL_WORDS = frozenset({'total', 'grand'})
+
+def _find_amount(text: str, patterns=_AMOUNT_PATTERNS) -> Tuple[Optional[float], Optional[str]]:
+    """Try the amount patterns in order and return the first amount found"""
+    for pattern in patterns:
+        amount, currency = _select_amount(pattern.findall(text))
+        if amount:
+            return amount, currency
+    
+    return None, None
+
+def _find_anchored_amount(lines: List[str]) -> Tuple[Optional[float], Optional[str]]:
+    """Search each total/amount line on its own, total/grand lines first"""
+    candidates = []
+    for line in lines:
+        words = set(_WORD_SPLIT.split(line))
+        if not _AMOUNT_ANCHORS.isdisjoint(words):
+            candidates.append((_TOTAL_WORDS.isdisjoint(words), line))
+    
+    # Stable sort keeps receipt order within each group
+    for _, line in sorted(candidates, key=lambda candidate: candidate[0]):
+        amount, currency = _find_amount(line, _ANCHORED_AMOUNT_PATTERNS)
+        if amount:
+            return amount, currency
+    
+    return None, None
+
+# Fields returned by extract_expense_form_data, in output order
+_FORM_FIELDS = ("description", "expense_date", "category", "paid_by", "total_amount", "currency", "remarks")
+
+# Confidence contributed by each extracted form field (other fields add 0.1)
+_CONFIDENCE_WEIGHTS = {
+    "total_amount": 0.3,  # Amount is most important
+    "expense_date": 0.2,  # Date is second most important
+    "description": 0.2,  # Description is important
+}
+
+# Images whose longest side is at least this many pixels are preprocessed on the
+# GPU; below it, the upload/download round trip costs more than it saves
+CUDA_MIN_IMAGE_SIDE = 2000
+
+def _cuda_device_available() -> bool:
+    """Check whether OpenCV was built with CUDA and can see a device"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+def _otsu_threshold(hist: np.ndarray) -> int:
+    """Compute Otsu's threshold from a 256-bin grayscale histogram"""
+    hist = hist.astype(np.float64).ravel()
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * np.arange(hist.size))
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    return int(np.argmax(weight_bg * weight_fg * (mean_bg - mean_fg) ** 2))
+
+def _split_lines(text: str) -> List[str]:
+    """Split text into stripped, non-empty lines"""
+    return [line.strip() for line in text.splitlines() if line.strip()]
 
 class OCRService:
     """Service for OCR processing of receipts"""
@@ -13,7 +213,20 @@ class OCRService:
     def __init__(self):
         # Configure tesseract path if needed (Windows)
         # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        pass
+        self.category_session = self.load_category_model(settings.category_model_path)
+        self.cuda_enabled = _cuda_device_available()
+        self._cuda_filters = None
+    
+    def load_category_model(self, model_path: str):
+        """Load the ONNX expense category classifier if one is configured"""
+        if not model_path or ort is None or not os.path.exists(model_path):
+            return None
+        
+        try:
+            return ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        except Exception as e:
+            print(f"Error loading category model: {e}")
+            return None
     
     def preprocess_image(self, image_path: str) -> np.ndarray:
         """Preprocess image for better OCR results"""
@@ -23,27 +236,49 @@ class OCRService:
             if image is None:
                 raise ValueError("Could not load image")
             
+            if self.cuda_enabled and max(image.shape[:2]) >= CUDA_MIN_IMAGE_SIDE:
+                try:
+                    return self.preprocess_image_cuda(image)
+                except cv2.error as e:
+                    print(f"CUDA preprocessing failed, falling back to CPU: {e}")
+            
             # Convert to grayscale
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             
-            # Apply Gaussian blur
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-            
-            # Apply threshold to get binary image
-            _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            # Apply Gaussian blur in place
+            cv2.GaussianBlur(gray, (5, 5), 0, dst=gray)
             
-            # Remove noise
-            kernel = np.ones((1, 1), np.uint8)
-            cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-            cleaned = cv2.medianBlur(cleaned, 3)
+            # Apply threshold in place to get binary image
+            cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=gray)
             
-            return cleaned
+            # Remove noise (a 3x3 median is a majority vote on a binary image)
+            return cv2.medianBlur(gray, 3)
             
         except Exception as e:
             print(f"Error preprocessing image: {e}")
             # Return original image if preprocessing fails
             return cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
     
+    def preprocess_image_cuda(self, image: np.ndarray) -> np.ndarray:
+        """Run the preprocessing chain on the GPU, downloading only the result"""
+        if self._cuda_filters is None:
+            self._cuda_filters = (
+                cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0),
+                cv2.cuda.createMedianFilter(cv2.CV_8UC1, 3),
+            )
+        gaussian, median = self._cuda_filters
+        
+        gpu_image = cv2.cuda_GpuMat()
+        gpu_image.upload(image)
+        gray = cv2.cuda.cvtColor(gpu_image, cv2.COLOR_BGR2GRAY)
+        blurred = gaussian.apply(gray)
+        
+        # CUDA threshold has no Otsu mode, so pick the level from the GPU histogram
+        level = _otsu_threshold(cv2.cuda.calcHist(blurred).download())
+        _, thresh = cv2.cuda.threshold(blurred, level, 255, cv2.THRESH_BINARY)
+        
+        return median.apply(thresh).download()
+    
     def extract_text_from_image(self, image_path: str) -> str:
         """Extract text from image using OCR"""
         try:
@@ -62,28 +297,11 @@ class OCRService:
     
     def extract_amount(self, text: str) -> Optional[float]:
         """Extract monetary amount from text"""
-        # Common currency symbols and patterns
-        currency_patterns = [
-            r'[\$£€¥₹]\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # $123.45, £1,234.56
-            r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*[\$£€¥₹]',  # 123.45$
-            r'(?:total|amount|sum|price|cost)[\s:]*[\$£€¥₹]?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Total: $123.45
-            r'(\d+(?:,\d{3})*\.\d{2})'  # Generic decimal number
-        ]
-        
-        for pattern in currency_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _CURRENCY_PATTERNS:
+            matches = pattern.findall(text)
             if matches:
                 # Get the largest amount (likely the total)
-                amounts = []
-                for match in matches:
-                    try:
-                        # Remove commas and convert to float
-                        amount_str = match.replace(',', '')
-                        amount = float(amount_str)
-                        amounts.append(amount)
-                    except ValueError:
-                        continue
-                
+                amounts = [amount for amount in _parse_amounts(matches) if amount is not None]
                 if amounts:
                     return max(amounts)
         
@@ -91,15 +309,8 @@ class OCRService:
     
     def extract_date(self, text: str) -> Optional[str]:
         """Extract date from text"""
-        date_patterns = [
-            r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',  # MM/DD/YYYY, DD/MM/YYYY
-            r'(\d{2,4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})',  # YYYY/MM/DD
-            r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})',  # DD Month YYYY
-            r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{2,4})'  # Month DD, YYYY
-        ]
-        
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _DATE_PATTERNS:
+            matches = pattern.findall(text)
             if matches:
                 return matches[0]
         
@@ -111,114 +322,84 @@ class OCRService:
         # Usually the merchant name is at the top of the receipt
         for line in lines[:5]:  # Check first 5 lines
             line = line.strip()
-            if len(line) > 3 and not re.match(r'^\d+[\s\d\-\/\.]*$', line):  # Not just numbers/dates
+            if len(line) > 3 and not _NUMERIC_LINE.match(line):  # Not just numbers/dates
                 # Remove common receipt terms
-                cleaned_line = re.sub(r'(?i)(receipt|bill|invoice|tax|gst|vat)', '', line).strip()
+                cleaned_line = _RECEIPT_TERMS.sub('', line).strip()
                 if len(cleaned_line) > 3:
                     return cleaned_line
         
         return None
     
-    def categorize_expense(self, text: str, merchant_name: Optional[str] = None) -> Optional[str]:
-        """Categorize expense based on text content"""
-        text_lower = text.lower()
+    def categorize_expense(self, text_lower: str, merchant_name: Optional[str] = None) -> Optional[str]:
+        """Categorize expense based on lowercased text content"""
+        if self.category_session is not None:
+            try:
+                input_name = self.category_session.get_inputs()[0].name
+                labels = self.category_session.run(None, {input_name: np.array([[text_lower]])})[0]
+                return str(labels[0])
+            except Exception as e:
+                print(f"Error running category model: {e}")
         
-        # Food & Dining
-        food_keywords = ['restaurant', 'cafe', 'coffee', 'food', 'dining', 'meal', 'lunch', 'dinner', 'breakfast']
-        if any(keyword in text_lower for keyword in food_keywords):
-            return "Food & Dining"
-        
-        # Transportation
-        transport_keywords = ['taxi', 'uber', 'lyft', 'bus', 'train', 'flight', 'airline', 'parking', 'fuel', 'gas']
-        if any(keyword in text_lower for keyword in transport_keywords):
-            return "Transportation"
-        
-        # Office Supplies
-        office_keywords = ['office', 'supplies', 'stationery', 'paper', 'pen', 'printer']
-        if any(keyword in text_lower for keyword in office_keywords):
-            return "Office Supplies"
+        if _CATEGORY_AUTOMATON is not None:
+            # Single pass over the text; the highest-priority category found wins
+            best = None
+            for _, (priority, category) in _CATEGORY_AUTOMATON.iter(text_lower):
+                if best is None or priority < best[0]:
+                    best = (priority, category)
+                    if priority == 0:
+                        break
+            return best[1] if best else "Other"
         
-        # Accommodation
-        hotel_keywords = ['hotel', 'motel', 'accommodation', 'lodging', 'stay']
-        if any(keyword in text_lower for keyword in hotel_keywords):
-            return "Accommodation"
+        for category, keywords in _CATEGORY_KEYWORDS:
+            if any(keyword in text_lower for keyword in keywords):
+                return category
         
         return "Other"
     
-    def extract_expense_form_data(self, text: str) -> Dict[str, Any]:
-        """Extract specific expense form fields from OCR text"""
+    def extract_expense_form_data(self, text: str, text_lower: Optional[str] = None,
+                                  lines: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Extract specific expense form fields from OCR text
+        
+        text_lower and lines (stripped, non-empty lines of text_lower) can be
+        passed in when the caller has already computed them.
+        """
         
         # Initialize result dictionary with all form fields
-        form_data = {
-            "description": None,
-            "expense_date": None,
-            "category": None,
-            "paid_by": None,
-            "total_amount": None,
-            "currency": None,
-            "remarks": None
-        }
+        form_data = dict.fromkeys(_FORM_FIELDS)
         
-        # Split text into lines for better processing
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
+        if lines is None:
+            lines = _split_lines(text_lower)
         
         # Extract Description
-        description_patterns = [
-            r'description[\s:]*([^\n\r]+)',
-            r'desc[\s:]*([^\n\r]+)',
-            r'item[\s:]*([^\n\r]+)',
-            r'expense[\s:]*([^\n\r]+)'
-        ]
-        
-        for pattern in description_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _FORM_DESCRIPTION_PATTERNS:
+            match = pattern.search(text)
             if match:
                 form_data["description"] = match.group(1).strip()
                 break
         
         # Extract Expense Date
-        date_patterns = [
-            r'expense\s+date[\s:]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
-            r'date[\s:]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
-            r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
-            r'(\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{2,4})',
-            r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2},?\s+\d{2,4})'
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _FORM_DATE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 form_data["expense_date"] = match.group(1).strip()
                 break
         
         # Extract Category
-        category_patterns = [
-            r'category[\s:]*([^\n\r]+)',
-            r'cat[\s:]*([^\n\r]+)',
-            r'type[\s:]*([^\n\r]+)'
-        ]
-        
-        for pattern in category_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _FORM_CATEGORY_PATTERNS:
+            match = pattern.search(text)
             if match:
                 form_data["category"] = match.group(1).strip()
                 break
         
         # If no explicit category found, try to categorize from content
         if not form_data["category"]:
-            form_data["category"] = self.categorize_expense(text)
+            form_data["category"] = self.categorize_expense(text_lower)
         
         # Extract Paid By
-        paid_by_patterns = [
-            r'paid\s+by[\s:]*([^\n\r]+)',
-            r'paidby[\s:]*([^\n\r]+)',
-            r'payment\s+method[\s:]*([^\n\r]+)',
-            r'paid[\s:]*([^\n\r]+)'
-        ]
-        
-        for pattern in paid_by_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _FORM_PAID_BY_PATTERNS:
+            match = pattern.search(text)
             if match:
                 paid_by_text = match.group(1).strip()
                 # Clean up common payment method indicators
@@ -227,17 +408,6 @@ class OCRService:
                 break
         
         # Extract Total Amount and Currency
-        amount_patterns = [
-            r'total\s+amount[\s:]*(\d+(?:,\d{3})*(?:\.\d{2})?)\s*([a-z]{3})',  # "567 USD"
-            r'total\s+amount[\s:]*([a-z]{3})\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # "USD 567"
-            r'amount[\s:]*(\d+(?:,\d{3})*(?:\.\d{2})?)\s*([a-z]{3})',  # "567 USD"
-            r'amount[\s:]*([a-z]{3})\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # "USD 567"
-            r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*([a-z]{3})',  # Generic "567 USD"
-            r'([a-z]{3})\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Generic "USD 567"
-            r'[\$£€¥₹]\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Symbol-based currencies
-            r'(\d+(?:,\d{3})*\.\d{2})'  # Generic decimal number
-        ]
-        
         # Look for currency indicators
         currency_indicators = {
             '$': 'USD', '£': 'GBP', '€': 'EUR', '¥': 'JPY', '₹': 'INR',
@@ -245,32 +415,15 @@ class OCRService:
             'dollar': 'USD', 'pound': 'GBP', 'euro': 'EUR', 'yen': 'JPY', 'rupee': 'INR'
         }
         
-        for pattern in amount_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                for match in matches:
-                    try:
-                        if isinstance(match, tuple) and len(match) == 2:
-                            first, second = match
-                            # Check which one is the number
-                            if first.replace(',', '').replace('.', '').isdigit():
-                                # First is amount, second is currency
-                                form_data["total_amount"] = float(first.replace(',', ''))
-                                form_data["currency"] = second.upper()
-                            elif second.replace(',', '').replace('.', '').isdigit():
-                                # First is currency, second is amount
-                                form_data["currency"] = first.upper()
-                                form_data["total_amount"] = float(second.replace(',', ''))
-                        else:
-                            # Single match (just amount)
-                            amount_str = match if isinstance(match, str) else str(match)
-                            amount_clean = amount_str.replace(',', '').strip()
-                            form_data["total_amount"] = float(amount_clean)
-                        break
-                    except (ValueError, IndexError):
-                        continue
-                if form_data["total_amount"]:
-                    break
+        # Only scan lines with total/amount keywords, falling back to the full text
+        amount, currency = _find_anchored_amount(lines)
+        if not amount:
+            amount, currency = _find_amount(text)
+        
+        if amount:
+            form_data["total_amount"] = amount
+            if currency:
+                form_data["currency"] = currency
         
         # Try to detect currency from symbols in text if not found
         if not form_data["currency"]:
@@ -284,21 +437,44 @@ class OCRService:
             form_data["currency"] = "USD"  # Default to USD
         
         # Extract Remarks
-        remarks_patterns = [
-            r'remarks[\s:]*([^\n\r]+)',
-            r'notes[\s:]*([^\n\r]+)',
-            r'comment[\s:]*([^\n\r]+)',
-            r'memo[\s:]*([^\n\r]+)'
-        ]
-        
-        for pattern in remarks_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _FORM_REMARKS_PATTERNS:
+            match = pattern.search(text)
             if match:
                 form_data["remarks"] = match.group(1).strip()
                 break
         
         return form_data
     
+    def extract_expense_form_data_batch(self, texts: List[str]) -> Dict[str, Any]:
+        """Extract expense form fields from many OCR texts as columns
+        
+        Returns one list per form field, with total_amount as a float array
+        (NaN where no amount was found), plus per-receipt confidence and
+        fields_extracted arrays computed over whole columns.
+        """
+        # Every field is present even for an empty batch
+        columns: Dict[str, Any] = {field: [] for field in _FORM_FIELDS}
+        for text in texts:
+            text_lower = text.lower()
+            form_data = self.extract_expense_form_data(text, text_lower, _split_lines(text_lower))
+            for field, value in form_data.items():
+                columns[field].append(value)
+        
+        confidence = np.zeros(len(texts))
+        fields_extracted = np.zeros(len(texts), dtype=np.int64)
+        for field, values in columns.items():
+            filled = np.fromiter((value is not None and bool(str(value).strip()) for value in values),
+                                 dtype=bool, count=len(values))
+            confidence += _CONFIDENCE_WEIGHTS.get(field, 0.1) * filled
+            fields_extracted += filled
+        
+        columns["total_amount"] = np.array(
+            [np.nan if amount is None else amount for amount in columns["total_amount"]], dtype=np.float64
+        )
+        columns["confidence"] = np.minimum(confidence, 1.0)
+        columns["fields_extracted"] = fields_extracted
+        return columns
+    
     def process_expense_receipt(self, image_path: str) -> Dict[str, Any]:
         """Process expense receipt and extract form-specific data"""
         try:
@@ -313,8 +489,9 @@ class OCRService:
                     "form_data": {}
                 }
             
-            # Extract form-specific data
-            form_data = self.extract_expense_form_data(text)
+            # Lowercase and split the text once for all field extractors
+            text_lower = text.lower()
+            form_data = self.extract_expense_form_data(text, text_lower, _split_lines(text_lower))
             
             # Calculate confidence based on extracted fields
             confidence = 0.0
@@ -324,14 +501,7 @@ class OCRService:
             for field, value in form_data.items():
                 if value is not None and str(value).strip():
                     filled_fields += 1
-                    if field == "total_amount":
-                        confidence += 0.3  # Amount is most important
-                    elif field == "expense_date":
-                        confidence += 0.2  # Date is second most important
-                    elif field == "description":
-                        confidence += 0.2  # Description is important
-                    else:
-                        confidence += 0.1  # Other fields
+                    confidence += _CONFIDENCE_WEIGHTS.get(field, 0.1)
             
             # Normalize confidence to 0-1 range
             confidence = min(confidence, 1.0)
@@ -1,25 +1,82 @@
 import os
+import sys
+import time
+import uuid
+import asyncio
+from base64 import b32hexencode
 from typing import Optional
+import aiofiles
 from fastapi import UploadFile, HTTPException
-import shutil
 from ..core.config import settings
 
-async def save_upload_file(upload_file: UploadFile, destination: str) -> str:
-    """Save uploaded file to destination"""
+# Read/write uploads in 1MB chunks
+CHUNK_SIZE = 1 << 20
+
+def _is_on_disk(file) -> bool:
+    """Check whether a spooled upload has rolled over to a real file"""
+    return sys.platform.startswith("linux") and getattr(file, "_rolled", False)
+
+def _file_too_large(max_bytes: int) -> HTTPException:
+    """Build the error raised for uploads over max_bytes"""
+    return HTTPException(status_code=413, detail=f"File too large. Maximum size is {max_bytes} bytes.")
+
+def _sendfile_copy(source, destination: str, max_bytes: int) -> None:
+    """Copy an on-disk upload to destination without leaving kernel space"""
+    source.flush()
+    offset = source.tell()
+    # The spooled file already holds the whole body, so its size is known up front
+    if os.fstat(source.fileno()).st_size - offset > max_bytes:
+        raise _file_too_large(max_bytes)
+    with open(destination, "wb") as buffer:
+        while True:
+            sent = os.sendfile(buffer.fileno(), source.fileno(), offset, CHUNK_SIZE)
+            if sent == 0:
+                break
+            offset += sent
+    source.seek(offset)
+
+def _remove_partial_file(path: str) -> None:
+    """Remove a partially written upload"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+async def save_upload_file(upload_file: UploadFile, destination: str, max_bytes: Optional[int] = None) -> str:
+    """Save uploaded file to destination, aborting with 413 once it exceeds max_bytes"""
+    if max_bytes is None:
+        max_bytes = settings.max_file_size
+    
     try:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(destination), exist_ok=True)
         
-        # Save file
-        with open(destination, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
+        # Save file without blocking the event loop
+        if _is_on_disk(upload_file.file):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, _sendfile_copy, upload_file.file, destination, max_bytes)
+        else:
+            written = 0
+            async with aiofiles.open(destination, "wb") as buffer:
+                while chunk := await upload_file.read(CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise _file_too_large(max_bytes)
+                    await buffer.write(chunk)
         
         return destination
+    except HTTPException:
+        _remove_partial_file(destination)
+        raise
     except Exception as e:
+        _remove_partial_file(destination)
         raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
 
 def validate_file_size(file: UploadFile) -> bool:
-    """Validate file size"""
+    """Early file size check against the client-reported size
+    
+    save_upload_file enforces the limit on the bytes actually written.
+    """
     if file.size and file.size > settings.max_file_size:
         return False
     return True
@@ -36,11 +93,9 @@ def get_file_extension(filename: str) -> str:
 
 def generate_unique_filename(original_filename: str) -> str:
     """Generate unique filename"""
-    import uuid
-    from datetime import datetime
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
+    # Nanosecond timestamp in base32hex, which keeps names sortable by upload time
+    timestamp = b32hexencode(time.time_ns().to_bytes(8, "big")).decode("ascii")[:12]
+    unique_id = uuid.uuid4().hex[:8]
     extension = get_file_extension(original_filename)
     
     return f"{timestamp}_{unique_id}{extension}"
\ No newline at end of file
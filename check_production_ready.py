@@ -7,8 +7,80 @@ Validates that your expense management system is ready for production deployment
 import os
 import sys
 import subprocess
+import hashlib
 from pathlib import Path
 
+# Fingerprint of the production files at the last passing check_files run
+_CACHE_FILE = ".check_production_ready.cache"
+
+_NEXT_STEPS = """
+🚀 Your Expense Management System is production-ready!
+
+📋 DEPLOYMENT CHECKLIST:
+
+1. CHOOSE DEPLOYMENT PLATFORM:
+   • Render (Recommended): Easy GitHub integration
+   • Railway: Simple deployment
+   • Heroku: Mature platform
+   • Docker + VPS: Full control
+
+2. SET UP DATABASE:
+   • PostgreSQL for production (recommended)
+   • Update DATABASE_URL in environment variables
+
+3. CONFIGURE ENVIRONMENT VARIABLES:
+   • Copy .env.production template
+   • Update with your actual values:
+     - DATABASE_URL (PostgreSQL connection string)
+     - SECRET_KEY (generate new secure key)
+     - EMAIL_USER and EMAIL_PASSWORD
+     - ALLOWED_ORIGINS (your frontend domain)
+     - ALLOWED_HOSTS (your backend domain)
+
+4. SECURITY CHECKLIST:
+   • Generate new SECRET_KEY
+   • Update default admin password after first login
+   • Configure HTTPS/SSL
+   • Set up monitoring
+
+5. DEPLOY:
+   • Follow platform-specific instructions in RENDER_DEPLOYMENT.md
+   • Monitor health endpoint: /health
+   • Access API docs: /docs (development only)
+
+📚 DOCUMENTATION:
+   • Read PRODUCTION_DEPLOYMENT.md for detailed guide
+   • Check RENDER_DEPLOYMENT.md for Render-specific steps
+
+🔐 DEFAULT ADMIN CREDENTIALS:
+   • Email: admin@company.com
+   • Password: admin123
+   • ⚠️ CHANGE THESE IMMEDIATELY AFTER FIRST LOGIN!
+
+🎯 FEATURES INCLUDED:
+   ✅ JWT Authentication & Authorization
+   ✅ OCR Receipt Processing
+   ✅ Multi-level Approval Workflows  
+   ✅ Multi-currency Support
+   ✅ Email Notifications
+   ✅ File Upload Management
+   ✅ Comprehensive API
+   ✅ Production Security
+   ✅ Health Monitoring
+   ✅ Docker Support
+   ✅ Database Migrations
+
+🌐 API ENDPOINTS:
+   • Authentication: /api/auth/*
+   • Users: /api/users/*
+   • Expenses: /api/expenses/*
+   • Approvals: /api/approvals/*
+   • Categories: /api/categories/*
+   • Currency: /api/currency/*
+
+Good luck with your deployment! 🎉
+"""
+
 def print_header(title):
     print(f"\n{'='*60}")
     print(f"  {title}")
@@ -18,6 +90,53 @@ def print_status(message, status="info"):
     symbols = {"success": "✅", "error": "❌", "warning": "⚠️", "info": "ℹ️"}
     print(f"{symbols.get(status, 'ℹ️')} {message}")
 
+def _collect_present(paths):
+    """Return the normalized paths that exist, listing each parent directory once"""
+    present = set()
+    for directory in {os.path.dirname(path) or "." for path in paths}:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    present.add(os.path.normpath(os.path.join(directory, entry.name)))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return present
+
+def _files_fingerprint(paths):
+    """Hash the required paths and the modification times of their directories"""
+    # Adding or removing a file bumps its directory's mtime, so the parent
+    # directories alone are enough to detect presence changes
+    digest = hashlib.blake2b()
+    digest.update("\n".join(paths).encode())
+    for directory in sorted({os.path.dirname(path) or "." for path in paths}):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtime = -1
+        digest.update(f"\n{directory}:{mtime}".encode())
+    return digest.hexdigest()
+
+def _read_cache():
+    """Return the fingerprint recorded by the last passing check, if any"""
+    try:
+        with open(_CACHE_FILE) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def _write_cache(paths):
+    """Record the fingerprint of a passing check"""
+    try:
+        # Creating the cache file bumps the current directory's mtime, so make
+        # sure it exists before fingerprinting; rewriting it in place does not
+        if not os.path.exists(_CACHE_FILE):
+            open(_CACHE_FILE, "w").close()
+        # A torn write only causes a fingerprint mismatch and a full check
+        with open(_CACHE_FILE, "w") as f:
+            f.write(_files_fingerprint(paths))
+    except OSError:
+        pass
+
 def check_files():
     """Check if all production files exist"""
     print_header("CHECKING PRODUCTION FILES")
@@ -38,9 +157,15 @@ def check_files():
         "RENDER_DEPLOYMENT.md"
     ]
     
+    # Skip the full scan when nothing changed since the last passing run
+    if _read_cache() == _files_fingerprint(required_files):
+        print_status("Production files unchanged since last successful check", "success")
+        return True
+    
+    present = _collect_present(required_files)
     missing_files = []
     for file_path in required_files:
-        if Path(file_path).exists():
+        if os.path.normpath(file_path) in present:
             print_status(f"{file_path}", "success")
         else:
             print_status(f"{file_path} - MISSING", "error")
@@ -51,6 +176,7 @@ def check_files():
         return False
     else:
         print_status("All production files present", "success")
+        _write_cache(required_files)
         return True
 
 def check_environment():
@@ -89,73 +215,7 @@ def show_next_steps():
     """Show next steps for deployment"""
     print_header("NEXT STEPS FOR PRODUCTION DEPLOYMENT")
     
-    print("""
-🚀 Your Expense Management System is production-ready!
-
-📋 DEPLOYMENT CHECKLIST:
-
-1. CHOOSE DEPLOYMENT PLATFORM:
-   • Render (Recommended): Easy GitHub integration
-   • Railway: Simple deployment
-   • Heroku: Mature platform
-   • Docker + VPS: Full control
-
-2. SET UP DATABASE:
-   • PostgreSQL for production (recommended)
-   • Update DATABASE_URL in environment variables
-
-3. CONFIGURE ENVIRONMENT VARIABLES:
-   • Copy .env.production template
-   • Update with your actual values:
-     - DATABASE_URL (PostgreSQL connection string)
-     - SECRET_KEY (generate new secure key)
-     - EMAIL_USER and EMAIL_PASSWORD
-     - ALLOWED_ORIGINS (your frontend domain)
-     - ALLOWED_HOSTS (your backend domain)
-
-4. SECURITY CHECKLIST:
-   • Generate new SECRET_KEY
-   • Update default admin password after first login
-   • Configure HTTPS/SSL
-   • Set up monitoring
-
-5. DEPLOY:
-   • Follow platform-specific instructions in RENDER_DEPLOYMENT.md
-   • Monitor health endpoint: /health
-   • Access API docs: /docs (development only)
-
-📚 DOCUMENTATION:
-   • Read PRODUCTION_DEPLOYMENT.md for detailed guide
-   • Check RENDER_DEPLOYMENT.md for Render-specific steps
-
-🔐 DEFAULT ADMIN CREDENTIALS:
-   • Email: admin@company.com
-   • Password: admin123
-   • ⚠️ CHANGE THESE IMMEDIATELY AFTER FIRST LOGIN!
-
-🎯 FEATURES INCLUDED:
-   ✅ JWT Authentication & Authorization
-   ✅ OCR Receipt Processing
-   ✅ Multi-level Approval Workflows  
-   ✅ Multi-currency Support
-   ✅ Email Notifications
-   ✅ File Upload Management
-   ✅ Comprehensive API
-   ✅ Production Security
-   ✅ Health Monitoring
-   ✅ Docker Support
-   ✅ Database Migrations
-
-🌐 API ENDPOINTS:
-   • Authentication: /api/auth/*
-   • Users: /api/users/*
-   • Expenses: /api/expenses/*
-   • Approvals: /api/approvals/*
-   • Categories: /api/categories/*
-   • Currency: /api/currency/*
-
-Good luck with your deployment! 🎉
-""")
+    print(_NEXT_STEPS)
 
 def main():
     """Main checker function"""
@@ -1,5 +1,6 @@
 # Gunicorn configuration file for production deployment
 
+import gc
 import os
 import multiprocessing
 
@@ -8,7 +9,9 @@ bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
 backlog = 2048
 
 # Worker processes
-workers = int(os.getenv('WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# The 2n+1 rule is for sync workers; each async UvicornWorker already
+# multiplexes many requests, so more workers than cores only adds contention
+workers = int(os.getenv('WORKERS', min(multiprocessing.cpu_count() + 1, 8)))
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
 max_requests = 1000
@@ -52,9 +55,18 @@ def worker_int(worker):
     worker.log.info("🔄 Worker received INT or QUIT signal")
 
 def pre_fork(server, worker):
+    # Move everything the preloaded app allocated into the permanent generation
+    # so the workers' collections don't write to (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
     server.log.info("👷 Worker spawned (pid: %s)", worker.pid)
 
 def post_fork(server, worker):
+    # With preload_app the engine was created in the master; drop the inherited
+    # pool so each worker opens its own connections (close=False leaves the
+    # master's sockets alone)
+    from app.core.database import engine
+    engine.dispose(close=False)
     server.log.info("✅ Worker spawned (pid: %s)", worker.pid)
 
 def worker_abort(worker):
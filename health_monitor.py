@@ -10,9 +10,15 @@ import time
 import os
 import sys
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,9 +30,23 @@ class HealthMonitor:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.session = None
+        self._etags = {}
+        self._head_unsupported = set()
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Pooled keep-alive connections and cached DNS, reused across checks
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            keepalive_timeout=30,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -36,7 +56,7 @@ class HealthMonitor:
     async def check_api_health(self):
         """Check API health endpoint"""
         try:
-            async with self.session.get(f"{self.base_url}/health", timeout=10) as response:
+            async with self.session.get(f"{self.base_url}/health") as response:
                 if response.status == 200:
                     data = await response.json()
                     return {
@@ -59,8 +79,7 @@ class HealthMonitor:
         """Check database connectivity through API"""
         try:
             async with self.session.get(f"{self.base_url}/api/users/me", 
-                                      headers={"Authorization": "Bearer invalid"}, 
-                                      timeout=10) as response:
+                                      headers={"Authorization": "Bearer invalid"}) as response:
                 # We expect 401 (unauthorized) which means DB is accessible
                 if response.status in [401, 422]:
                     return {"status": "healthy", "message": "Database accessible"}
@@ -69,33 +88,48 @@ class HealthMonitor:
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
     
-    async def check_external_apis(self):
-        """Check external API dependencies"""
-        results = {}
-        
-        # Check exchange rate API
-        try:
-            async with self.session.get("https://api.exchangerate-api.com/v4/latest/USD", 
-                                      timeout=10) as response:
-                if response.status == 200:
-                    results["exchange_rate_api"] = {"status": "healthy"}
-                else:
-                    results["exchange_rate_api"] = {"status": "unhealthy", "error": f"HTTP {response.status}"}
-        except Exception as e:
-            results["exchange_rate_api"] = {"status": "unhealthy", "error": str(e)}
-        
-        # Check countries API
+    async def _conditional_get(self, url):
+        """GET url with the last seen ETag and return the status"""
+        # A conditional GET keeps repeat probes to a 304 with no body
+        headers = {"If-None-Match": self._etags[url]} if url in self._etags else None
+        async with self.session.get(url, headers=headers) as response:
+            if "ETag" in response.headers:
+                self._etags[url] = response.headers["ETag"]
+            return response.status
+    
+    async def check_external_api(self, url):
+        """Check a single external API"""
         try:
-            async with self.session.get("https://restcountries.com/v3.1/all?fields=name,currencies&limit=1", 
-                                      timeout=10) as response:
-                if response.status == 200:
-                    results["countries_api"] = {"status": "healthy"}
-                else:
-                    results["countries_api"] = {"status": "unhealthy", "error": f"HTTP {response.status}"}
+            if url in self._head_unsupported:
+                status = await self._conditional_get(url)
+            else:
+                # Only the status matters, so skip the response body where possible
+                async with self.session.head(url, allow_redirects=True) as response:
+                    status = response.status
+                if status == 405:
+                    # HEAD not allowed; remember it so later ticks send only the GET
+                    self._head_unsupported.add(url)
+                    status = await self._conditional_get(url)
+            
+            if status in (200, 304):
+                return {"status": "healthy"}
+            else:
+                return {"status": "unhealthy", "error": f"HTTP {status}"}
         except Exception as e:
-            results["countries_api"] = {"status": "unhealthy", "error": str(e)}
+            return {"status": "unhealthy", "error": str(e)}
+    
+    async def check_external_apis(self):
+        """Check external API dependencies"""
+        # Probe both APIs concurrently so their round trips overlap
+        exchange_rate_api, countries_api = await asyncio.gather(
+            self.check_external_api("https://api.exchangerate-api.com/v4/latest/USD"),
+            self.check_external_api("https://restcountries.com/v3.1/all?fields=name,currencies&limit=1")
+        )
         
-        return results
+        return {
+            "exchange_rate_api": exchange_rate_api,
+            "countries_api": countries_api
+        }
     
     async def run_health_check(self):
         """Run complete health check"""
@@ -115,7 +149,7 @@ class HealthMonitor:
         
         # Compile results
         results = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "total_check_time": round(end_time - start_time, 2),
             "overall_status": "healthy",
             "components": {
@@ -139,28 +173,46 @@ class HealthMonitor:
                         break
         
         return results
+    
+    async def run_forever(self, interval):
+        """Run health checks every `interval` seconds, reusing the same session"""
+        while True:
+            report_results(await self.run_health_check())
+            await asyncio.sleep(interval)
+
+def report_results(results):
+    """Print health check results and return the matching exit code"""
+    # Print results
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(results, option=orjson.OPT_INDENT_2) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(results, indent=2))
+    
+    # Log summary
+    status = results["overall_status"]
+    if status == "healthy":
+        logger.info("✅ All systems healthy")
+        return 0
+    elif status == "degraded":
+        logger.warning("⚠️ Some systems degraded")
+        return 1
+    else:
+        logger.error("❌ System unhealthy")
+        return 2
 
 async def main():
     """Main monitoring function"""
     base_url = os.getenv("API_BASE_URL", "http://localhost:8000")
+    interval = os.getenv("MONITOR_INTERVAL")
     
     async with HealthMonitor(base_url) as monitor:
-        results = await monitor.run_health_check()
-        
-        # Print results
-        print(json.dumps(results, indent=2))
-        
-        # Log summary
-        status = results["overall_status"]
-        if status == "healthy":
-            logger.info("✅ All systems healthy")
-            sys.exit(0)
-        elif status == "degraded":
-            logger.warning("⚠️ Some systems degraded")
-            sys.exit(1)
+        if interval:
+            # Sidecar mode: keep connections warm between checks
+            await monitor.run_forever(float(interval))
         else:
-            logger.error("❌ System unhealthy")
-            sys.exit(2)
+            results = await monitor.run_health_check()
+            sys.exit(report_results(results))
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,11 +1,19 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, engine
-from app.models.models import Base, User, Company, ExpenseCategory
+from app.models.models import Base, User, Company, Category
 from app.core.security import get_password_hash
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 
 def create_default_data():
     """Create default data for testing"""
+    # bcrypt is deliberately slow, so hash the seed passwords in parallel;
+    # one process per password, forked before any session is opened
+    passwords = ["admin123", "manager123", "employee123"]
+    with ProcessPoolExecutor(max_workers=len(passwords)) as executor:
+        admin_hash, manager_hash, employee_hash = executor.map(get_password_hash, passwords)
+    
     db = SessionLocal()
     
     try:
@@ -21,7 +29,7 @@ def create_default_data():
         # Create default admin user
         admin_user = User(
             email="admin@democompany.com",
-            hashed_password=get_password_hash("admin123"),
+            hashed_password=admin_hash,
             first_name="Admin",
             last_name="User",
             role="admin",
@@ -33,7 +41,7 @@ def create_default_data():
         # Create default manager
         manager_user = User(
             email="manager@democompany.com",
-            hashed_password=get_password_hash("manager123"),
+            hashed_password=manager_hash,
             first_name="Manager",
             last_name="User",
             role="manager",
@@ -45,7 +53,7 @@ def create_default_data():
         # Create default employee
         employee_user = User(
             email="employee@democompany.com",
-            hashed_password=get_password_hash("employee123"),
+            hashed_password=employee_hash,
             first_name="Employee",
             last_name="User",
             role="employee",
@@ -65,14 +73,16 @@ def create_default_data():
             {"name": "Other", "description": "Miscellaneous expenses"}
         ]
         
-        for cat_data in categories:
-            category = ExpenseCategory(
-                name=cat_data["name"],
-                description=cat_data["description"],
-                company_id=company.id,
-                is_active=True
-            )
-            db.add(category)
+        # One executemany INSERT instead of a unit-of-work pass per category
+        db.execute(insert(Category), [
+            {
+                "name": cat_data["name"],
+                "description": cat_data["description"],
+                "company_id": company.id,
+                "is_active": True
+            }
+            for cat_data in categories
+        ])
         
         db.commit()
         print("✅ Default data created successfully!")
@@ -95,12 +105,15 @@ def init_db():
     # Check if we need to create default data
     db = SessionLocal()
     try:
-        user_count = db.query(User).count()
-        if user_count == 0:
-            print("🔄 Creating default data...")
-            create_default_data()
+        # LIMIT 1 probe instead of COUNT(*) over the whole users table
+        needs_default_data = db.query(User.id).first() is None
     finally:
         db.close()
+    
+    # Probe session is closed before seeding forks the hashing workers
+    if needs_default_data:
+        print("🔄 Creating default data...")
+        create_default_data()
 
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
@@ -7,7 +7,7 @@ This script handles database initialization and migrations for production deploy
 import os
 import sys
 import logging
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, insert, text
 from sqlalchemy.exc import OperationalError
 
 # Add the app directory to the path
@@ -20,23 +20,48 @@ from app.models.models import *  # Import all models
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def wait_for_database(max_retries=30, retry_interval=2):
+_DEFAULT_CATEGORIES = (
+    "Travel",
+    "Meals & Entertainment",
+    "Office Supplies",
+    "Training & Education",
+    "Software & Subscriptions",
+    "Transportation",
+    "Accommodation",
+    "Equipment",
+    "Utilities",
+    "Other",
+)
+
+def wait_for_database(max_retries=8, retry_interval=2, max_interval=10):
     """Wait for database to be available"""
     import time
     
+    # Worst case against an unreachable host: 8 x 5s connect timeouts plus
+    # 54s of backoff = ~94s, inside production_startup's 120s migration timeout
+    # Build one pooled engine up front and retry connections on it
+    connect_args = {} if settings.database_url.startswith("sqlite") else {"connect_timeout": 5}
+    engine = create_engine(
+        settings.database_url,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        connect_args=connect_args
+    )
+    
     for attempt in range(max_retries):
         try:
-            engine = create_engine(settings.database_url)
             with engine.connect() as connection:
                 connection.execute(text("SELECT 1"))
             logger.info("✅ Database is available")
             return engine
         except OperationalError as e:
-            logger.warning(f"⏳ Database not ready (attempt {attempt + 1}/{max_retries}): {e}")
+            logger.warning("⏳ Database not ready (attempt %d/%d): %s", attempt + 1, max_retries, e)
             if attempt < max_retries - 1:
-                time.sleep(retry_interval)
+                # Exponential backoff, capped at max_interval seconds
+                time.sleep(min(retry_interval * 2 ** attempt, max_interval))
             else:
                 logger.error("❌ Database is not available after maximum retries")
+                engine.dispose()
                 raise
 
 def create_database_schema(engine):
@@ -45,14 +70,14 @@ def create_database_schema(engine):
         logger.info("🔨 Creating database schema...")
         Base.metadata.create_all(bind=engine)
         
-        # Verify tables were created
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
-        logger.info(f"✅ Created {len(tables)} tables: {', '.join(tables)}")
+        # Report the tables from the in-memory metadata; create_all already
+        # raised if any of them could not be created
+        tables = list(Base.metadata.tables.keys())
+        logger.info("✅ Created/verified %d tables: %s", len(tables), ", ".join(tables))
         
         return True
     except Exception as e:
-        logger.error(f"❌ Failed to create database schema: {e}")
+        logger.error("❌ Failed to create database schema: %s", e)
         return False
 
 def create_initial_data(engine):
@@ -93,28 +118,16 @@ def create_initial_data(engine):
         )
         db.add(admin_user)
         
-        # Create default expense categories
-        categories = [
-            "Travel",
-            "Meals & Entertainment", 
-            "Office Supplies",
-            "Training & Education",
-            "Software & Subscriptions",
-            "Transportation",
-            "Accommodation",
-            "Equipment",
-            "Utilities",
-            "Other"
-        ]
-        
-        for category_name in categories:
-            category = Category(
-                name=category_name,
-                description=f"Default category for {category_name.lower()} expenses",
-                company_id=company.id,
-                is_active=True
-            )
-            db.add(category)
+        # Create default expense categories with one executemany INSERT
+        db.execute(insert(Category), [
+            {
+                "name": category_name,
+                "description": f"Default category for {category_name.lower()} expenses",
+                "company_id": company.id,
+                "is_active": True
+            }
+            for category_name in _DEFAULT_CATEGORIES
+        ])
         
         db.commit()
         logger.info("✅ Initial data created successfully")
@@ -126,14 +139,14 @@ def create_initial_data(engine):
         return True
         
     except Exception as e:
-        logger.error(f"❌ Failed to create initial data: {e}")
+        logger.error("❌ Failed to create initial data: %s", e)
         db.rollback()
         return False
     finally:
         db.close()
 
 def main():
-    """Main migration function"""
+    """Main migration function, returns a process exit code"""
     logger.info("🚀 Starting production database migration...")
     
     try:
@@ -142,17 +155,18 @@ def main():
         
         # Create schema
         if not create_database_schema(engine):
-            sys.exit(1)
+            return 1
         
         # Create initial data
         if not create_initial_data(engine):
-            sys.exit(1)
+            return 1
         
         logger.info("🎉 Production database migration completed successfully!")
+        return 0
         
     except Exception as e:
-        logger.error(f"💥 Migration failed: {e}")
-        sys.exit(1)
+        logger.error("💥 Migration failed: %s", e)
+        return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
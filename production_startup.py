@@ -7,9 +7,12 @@ Handles pre-flight checks and application startup for production deployment.
 import os
 import sys
 import time
+import shutil
+import functools
+import importlib.util
 import logging
-import subprocess
-from pathlib import Path
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 # Configure logging
 logging.basicConfig(
@@ -33,7 +36,7 @@ def check_environment():
             missing_vars.append(var)
     
     if missing_vars:
-        logger.error(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
+        logger.error("❌ Missing required environment variables: %s", ", ".join(missing_vars))
         return False
     
     logger.info("✅ All required environment variables are set")
@@ -41,27 +44,38 @@ def check_environment():
 
 def check_dependencies():
     """Check if required dependencies are installed"""
+    # Only locate the modules instead of importing them: the server is exec'd
+    # into a fresh process anyway, and a broken install still fails there
+    # within milliseconds of the workers starting
+    modules = ("fastapi", "sqlalchemy", "uvicorn", "pytesseract")
+    missing = [module for module in modules if importlib.util.find_spec(module) is None]
+    if missing:
+        logger.error("❌ Missing dependency: %s", ", ".join(missing))
+        return False
+    
+    logger.info("✅ Core dependencies available")
+    return True
+
+@functools.lru_cache(maxsize=1)
+def _probe_tesseract():
+    """Probe Tesseract once, returning (version, error)"""
+    # Skip the `tesseract --version` fork entirely when the binary is absent
+    if not shutil.which("tesseract"):
+        return None, "tesseract binary not found in PATH"
     try:
-        import fastapi
-        import sqlalchemy
-        import uvicorn
         import pytesseract
-        logger.info("✅ Core dependencies available")
-        return True
-    except ImportError as e:
-        logger.error(f"❌ Missing dependency: {e}")
-        return False
+        return pytesseract.get_tesseract_version(), None
+    except Exception as e:
+        return None, str(e)
 
 def check_tesseract():
     """Check if Tesseract OCR is available"""
-    try:
-        import pytesseract
-        # Try to get Tesseract version
-        version = pytesseract.get_tesseract_version()
-        logger.info(f"✅ Tesseract OCR available (version: {version})")
+    version, error = _probe_tesseract()
+    if error is None:
+        logger.info("✅ Tesseract OCR available (version: %s)", version)
         return True
-    except Exception as e:
-        logger.warning(f"⚠️ Tesseract OCR not available: {e}")
+    else:
+        logger.warning("⚠️ Tesseract OCR not available: %s", error)
         logger.warning("OCR features will be disabled")
         return False
 
@@ -73,28 +87,48 @@ def create_directories():
     ]
     
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
-        logger.info(f"📁 Created directory: {directory}")
+        # The image usually ships these already, so check before creating
+        if os.path.isdir(directory):
+            continue
+        os.makedirs(directory, exist_ok=True)
+        logger.info("📁 Created directory: %s", directory)
 
-def run_database_migration():
-    """Run database migration if needed"""
+def start_database_migration():
+    """Start the database migration in a background thread
+    
+    The migration runs in-process, reusing this interpreter instead of
+    spawning a new one. A daemon thread is used so a hung migration cannot
+    block shutdown after the timeout.
+    """
     logger.info("🗄️ Running database migration...")
+    future = Future()
+    
+    def run():
+        try:
+            from migrate_production import main as run_migration
+            future.set_result(run_migration())
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name="database-migration", daemon=True).start()
+    return future
+
+def wait_for_database_migration(migration, timeout=120):
+    """Wait for the background migration to finish"""
     try:
-        result = subprocess.run([
-            sys.executable, "migrate_production.py"
-        ], capture_output=True, text=True, timeout=120)
-        
-        if result.returncode == 0:
-            logger.info("✅ Database migration completed")
-            return True
-        else:
-            logger.error(f"❌ Database migration failed: {result.stderr}")
-            return False
-    except subprocess.TimeoutExpired:
+        returncode = migration.result(timeout=timeout)
+    except FutureTimeoutError:
         logger.error("❌ Database migration timed out")
         return False
     except Exception as e:
-        logger.error(f"❌ Database migration error: {e}")
+        logger.error("❌ Database migration error: %s", e)
+        return False
+    
+    if returncode == 0:
+        logger.info("✅ Database migration completed")
+        return True
+    else:
+        logger.error("❌ Database migration failed with exit code %s", returncode)
         return False
 
 def start_application():
@@ -108,32 +142,41 @@ def start_application():
     
     if use_gunicorn:
         cmd = [
-            "gunicorn", 
+            sys.executable, "-m", "gunicorn",
             "-c", "gunicorn.conf.py",
             "app.main:app"
         ]
     else:
         cmd = [
-            "uvicorn",
+            sys.executable, "-m", "uvicorn",
             "app.main:app",
             "--host", "0.0.0.0",
             "--port", str(port),
             "--workers", str(workers)
         ]
     
-    logger.info(f"🌟 Starting with command: {' '.join(cmd)}")
+    logger.info("🌟 Starting with command: %s", " ".join(cmd))
     
     try:
-        os.execvp(cmd[0], cmd)
+        # Replace this process with the server using the same interpreter, so no
+        # PATH lookup is needed; modules imported by the checks are discarded
+        # and the server starts from a clean address space
+        os.execv(sys.executable, cmd)
     except Exception as e:
-        logger.error(f"❌ Failed to start application: {e}")
+        logger.error("❌ Failed to start application: %s", e)
         sys.exit(1)
 
 def main():
     """Main startup function"""
     logger.info("🏁 Starting production deployment checks...")
     
-    # Run all pre-flight checks
+    # Create necessary directories
+    create_directories()
+    
+    # Start the migration so it overlaps with the pre-flight checks
+    migration = start_database_migration()
+    
+    # Run all pre-flight checks concurrently
     checks = [
         ("Environment Variables", check_environment),
         ("Dependencies", check_dependencies),
@@ -141,26 +184,29 @@ def main():
     ]
     
     failed_checks = []
-    for check_name, check_func in checks:
-        logger.info(f"🔍 Checking {check_name}...")
-        if not check_func():
-            failed_checks.append(check_name)
-    
-    # Create necessary directories
-    create_directories()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = []
+        for check_name, check_func in checks:
+            logger.info("🔍 Checking %s...", check_name)
+            futures.append((check_name, executor.submit(check_func)))
+        
+        # Collect results in declared order so the summary is deterministic
+        for check_name, future in futures:
+            if not future.result():
+                failed_checks.append(check_name)
     
-    # Run database migration
-    if not run_database_migration():
+    # Wait for database migration
+    if not wait_for_database_migration(migration):
         failed_checks.append("Database Migration")
     
     # Check if any critical checks failed
     critical_failures = [f for f in failed_checks if f not in ["Tesseract OCR"]]
     if critical_failures:
-        logger.error(f"💥 Critical checks failed: {', '.join(critical_failures)}")
+        logger.error("💥 Critical checks failed: %s", ", ".join(critical_failures))
         sys.exit(1)
     
     if failed_checks:
-        logger.warning(f"⚠️ Some non-critical checks failed: {', '.join(failed_checks)}")
+        logger.warning("⚠️ Some non-critical checks failed: %s", ", ".join(failed_checks))
     
     logger.info("✅ All critical pre-flight checks passed")
     
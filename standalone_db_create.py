@@ -1,179 +1,230 @@
 """
 Universal database creation script (SQLite/PostgreSQL/MySQL)
 """
+import argparse
+import importlib
 import os
-from sqlalchemy import create_engine, inspect
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Enum as SQLEnum
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.sql import func
-import enum
-
-# Use environment variable or fallback
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./expense_system.db")
-
-# Create base
-Base = declarative_base()
-
-# Define enums
-class UserRole(str, enum.Enum):
-    ADMIN = "admin"
-    MANAGER = "manager"
-    EMPLOYEE = "employee"
-
-class ExpenseStatus(str, enum.Enum):
-    PENDING = "pending"
-    APPROVED = "approved"
-    REJECTED = "rejected"
-
-class ExpenseCategory(str, enum.Enum):
-    FOOD_DINING = "food_dining"
-    TRANSPORTATION = "transportation"
-    ACCOMMODATION = "accommodation"
-    OFFICE_SUPPLIES = "office_supplies"
-    TRAVEL = "travel"
-    ENTERTAINMENT = "entertainment"
-    OTHER = "other"
-
-class ApprovalRuleType(str, enum.Enum):
-    PERCENTAGE = "percentage"
-    SPECIFIC_APPROVER = "specific_approver"
-    HYBRID = "hybrid"
-
-# Define models
-class Company(Base):
-    __tablename__ = "companies"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False)
-    country = Column(String(100), nullable=False)
-    currency = Column(String(3), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-class User(Base):
-    __tablename__ = "users"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
-    first_name = Column(String(100), nullable=False)
-    last_name = Column(String(100), nullable=False)
-    role = Column(SQLEnum(UserRole), default=UserRole.EMPLOYEE)
-    is_active = Column(Boolean, default=True)
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-class Expense(Base):
-    __tablename__ = "expenses"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
-    currency = Column(String(3), nullable=False)
-    category = Column(SQLEnum(ExpenseCategory), nullable=False)
-    description = Column(Text, nullable=False)
-    expense_date = Column(DateTime, nullable=False)
-    receipt_url = Column(String(500), nullable=True)
-    status = Column(SQLEnum(ExpenseStatus), default=ExpenseStatus.PENDING)
-    amount_in_company_currency = Column(Float, nullable=False)
-    employee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-class Approval(Base):
-    __tablename__ = "approvals"
+import sys
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+def build_mysql_url():
+    """Build a MySQL URL from the DB_* variables, or None if DB_HOST is unset"""
+    if not os.getenv("DB_HOST"):
+        return None
+    # URL.create takes the raw values, so no user or password escaping is needed
+    return URL.create(
+        drivername="mysql+pymysql",
+        username=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", ""),
+        host=os.getenv("DB_HOST"),
+        port=int(os.getenv("DB_PORT", 3306)),
+        database=os.getenv("DB_NAME", "expense_system"),
+        query={"charset": "utf8mb4"},
+    )
+
+# Use environment variable, then DB_* settings, then fallback
+DATABASE_URL = os.getenv("DATABASE_URL") or build_mysql_url() or "sqlite:///./expense_system.db"
+
+# Connection pool settings for server databases (SQLite keeps its own pool)
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": True,
+    "pool_use_lifo": True,
+}
+
+# Backend name -> (log line, engine options)
+BACKENDS = {
+    "postgresql": ("🐘 Using PostgreSQL database", POOL_OPTIONS),  # Render
+    "mysql": ("🐬 Using MySQL database", POOL_OPTIONS),
+    "sqlite": ("📁 Using SQLite database", {}),  # local development
+}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLite tuning on every new connection"""
+    # WAL + NORMAL sync avoid an fsync per DDL statement
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+# Engine is built once and reused so its compiled statement cache carries over
+_engine = None
+
+# Connection left open by test_mysql_connection for the engine's first checkout
+_bootstrap_connection = None
+
+def _reuse_bootstrap_connection(dialect, connection_record, cargs, cparams):
+    """Hand the already-authenticated setup connection to the pool once"""
+    global _bootstrap_connection
+    connection, _bootstrap_connection = _bootstrap_connection, None
+    return connection  # None means connect normally
+
+def get_engine(log=print):
+    """Create appropriate engine based on DATABASE_URL"""
+    global _engine
+    if _engine is not None:
+        return _engine
     
-    id = Column(Integer, primary_key=True, index=True)
-    expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=False)
-    approver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    status = Column(SQLEnum(ExpenseStatus), default=ExpenseStatus.PENDING)
-    sequence = Column(Integer, default=1)
-    comments = Column(Text, nullable=True)
-    approved_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-class ApprovalRule(Base):
-    __tablename__ = "approval_rules"
+    url = make_url(DATABASE_URL)
+    label, options = BACKENDS.get(url.get_backend_name(), BACKENDS["sqlite"])
+    if url.get_backend_name() == "mysql":
+        # Allow several statements per execute (FOUND_ROWS is what the dialect sets by default)
+        from pymysql.constants import CLIENT
+        options = dict(options, connect_args={"client_flag": CLIENT.MULTI_STATEMENTS | CLIENT.FOUND_ROWS})
+    engine = create_engine(url, echo=False, query_cache_size=1200, **options)
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    elif url.get_backend_name() == "mysql":
+        event.listen(engine, "do_connect", _reuse_bootstrap_connection)
+    log(label)
     
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False)
-    rule_type = Column(SQLEnum(ApprovalRuleType), nullable=False)
-    min_amount = Column(Float, nullable=True)
-    max_amount = Column(Float, nullable=True)
-    percentage_required = Column(Float, nullable=True)
-    specific_approver_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    is_active = Column(Boolean, default=True)
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-class ApprovalRuleApprover(Base):
-    __tablename__ = "approval_rule_approvers"
+    _engine = engine
+    return engine
+
+def test_mysql_connection():
+    """Make sure the MySQL database named in DATABASE_URL exists"""
+    global _bootstrap_connection
+    import pymysql
+    from pymysql.constants import CLIENT
     
-    id = Column(Integer, primary_key=True, index=True)
-    rule_id = Column(Integer, ForeignKey("approval_rules.id"), nullable=False)
-    approver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    sequence = Column(Integer, default=1)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-class Category(Base):
-    __tablename__ = "categories"
+    url = make_url(DATABASE_URL)
+    if not url.database:
+        print("❌ MySQL setup failed: DATABASE_URL has no database name")
+        return False
     
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False)
-    description = Column(Text, nullable=True)
-    is_active = Column(Boolean, default=True)
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-def get_engine():
-    """Create appropriate engine based on DATABASE_URL"""
-    if DATABASE_URL.startswith("postgresql"):
-        # PostgreSQL (Render)
-        engine = create_engine(DATABASE_URL, echo=False)
-        print("🐘 Using PostgreSQL database")
-    elif DATABASE_URL.startswith("mysql"):
-        # MySQL
-        engine = create_engine(DATABASE_URL, echo=False)
-        print("🐬 Using MySQL database")
-    else:
-        # SQLite (local development)
-        engine = create_engine(DATABASE_URL, echo=False)
-        print("📁 Using SQLite database")
+    try:
+        print(f"🐬 Connecting to MySQL server at {url.host}...")
+        # autocommit and charset at connect time avoid extra SET round-trips;
+        # the client flags match the engine's so the connection can be reused
+        connection = pymysql.connect(
+            host=url.host or "localhost",
+            port=url.port or 3306,
+            user=url.username,
+            password=url.password or "",
+            autocommit=True,
+            charset="utf8mb4",
+            client_flag=CLIENT.MULTI_STATEMENTS | CLIENT.FOUND_ROWS,
+        )
+        try:
+            with connection.cursor() as cursor:
+                # IF NOT EXISTS is idempotent, so there is no need to check afterwards
+                # Backticks inside an identifier are escaped by doubling them
+                database = url.database.replace("`", "``")
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}` CHARACTER SET utf8mb4")
+            connection.select_db(url.database)
+            connection.autocommit(False)
+        except pymysql.err.MySQLError:
+            connection.close()
+            raise
+        
+        # Keep it open; get_engine's pool takes it instead of a fresh TCP + auth handshake
+        _bootstrap_connection = connection
+        print(f"✅ Database '{url.database}' is ready")
+        return True
+        
+    except pymysql.err.MySQLError as e:
+        print(f"❌ MySQL setup failed: {str(e)}")
+        return False
+
+def _setup_metadata():
+    """Import the models (deferred until tables are actually created)"""
+    # Models live in app.models; importing them registers every table on Base
+    from app.models.models import Base
+    return Base.metadata
+
+def create_tables_in_one_batch(conn, tables):
+    """Send the CREATE TABLE/INDEX DDL for tables as a single multi-statement script"""
+    statements = []
+    for table in tables:
+        statements.append(str(CreateTable(table).compile(dialect=conn.dialect)))
+        statements.extend(str(CreateIndex(index).compile(dialect=conn.dialect)) for index in table.indexes)
     
-    return engine
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(";\n".join(statements))
+        # Drain every result so an error in a later statement is raised here
+        while cursor.nextset():
+            pass
+    finally:
+        cursor.close()
+
+def _write_messages(messages):
+    """Emit buffered progress lines with a single write"""
+    if messages:
+        sys.stdout.write("\n".join(messages) + "\n")
+        sys.stdout.flush()
 
 def create_database():
     """Create all database tables"""
+    # Progress lines are buffered and written once at the end
+    messages = []
     try:
-        print(f"🔌 Connecting to database...")
-        print(f"📊 URL: {DATABASE_URL[:50]}...")  # Don't show full URL for security
+        messages.append("🔌 Connecting to database...")
+        messages.append(f"📊 URL: {str(DATABASE_URL)[:50]}...")  # Don't show full URL for security
         
-        engine = get_engine()
+        engine = get_engine(log=messages.append)
+        metadata = _setup_metadata()
         
-        print("🔨 Creating database tables...")
-        Base.metadata.create_all(bind=engine)
+        messages.append("🔨 Creating database tables...")
+        # One connection (and one transaction where DDL is transactional) for all tables
+        with engine.begin() as conn:
+            # Look up existing tables once instead of probing each table in create_all
+            existing = set(inspect(conn).get_table_names())
+            missing = [table for table in metadata.sorted_tables if table.name not in existing]
+            if missing and conn.dialect.name == "mysql":
+                # MySQL commits each DDL statement anyway; one round trip for the lot
+                create_tables_in_one_batch(conn, missing)
+            elif missing:
+                metadata.create_all(bind=conn, tables=missing, checkfirst=False)
+            else:
+                messages.append("ℹ️ All tables already exist")
         
         # Verify tables
         inspector = inspect(engine)
         tables = inspector.get_table_names()
         
-        print(f"\n✅ Successfully created {len(tables)} tables:")
-        for table in sorted(tables):
-            print(f"   • {table}")
+        messages.append(f"\n✅ Successfully created {len(tables)} tables:")
+        messages.extend(f"   • {table}" for table in sorted(tables))
         
-        print(f"\n🎉 Database setup completed!")
+        messages.append(f"\n🎉 Database setup completed!")
+        _write_messages(messages)
         return True
         
     except Exception as e:
-        print(f"❌ Error creating database: {str(e)}")
+        _write_messages(messages)
+        sys.stderr.write(f"❌ Error creating database: {str(e)}\n")
         return False
 
-if __name__ == "__main__":
+def main():
+    """Command line entry point"""
+    global DATABASE_URL
+    parser = argparse.ArgumentParser(description="Create the expense system database tables")
+    parser.add_argument("--url", help="database URL (defaults to DATABASE_URL)")
+    parser.add_argument("--mysql-setup", action="store_true",
+                        help="create the MySQL database itself before the tables")
+    args = parser.parse_args()
+    
+    if args.url:
+        DATABASE_URL = args.url
+    
+    # Import the dialect up front rather than inside the first create_engine
+    backend = make_url(DATABASE_URL).get_backend_name()
+    if backend in BACKENDS:
+        importlib.import_module(f"sqlalchemy.dialects.{backend}")
+    
     print("🚀 Universal Database Setup")
     print("=" * 50)
-    create_database()
\ No newline at end of file
+    if args.mysql_setup and not test_mysql_connection():
+        return 1
+    return 0 if create_database() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Expense Category Model Trainer
+Trains a small text classifier on labeled receipt text and exports it to ONNX
+for use by the OCR service (set CATEGORY_MODEL_PATH to the output file).
+
+Usage: python train_category_model.py receipts.csv [category_model.onnx]
+The CSV must have "text" and "category" columns.
+"""
+
+import csv
+import sys
+
+def load_receipts(csv_path):
+    """Load (text, category) pairs from a CSV file"""
+    texts, labels = [], []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("text") and row.get("category"):
+                texts.append(row["text"].lower())
+                labels.append(row["category"])
+    return texts, labels
+
+def train_model(texts, labels):
+    """Fit a TF-IDF + logistic regression pipeline"""
+    from sklearn.pipeline import Pipeline
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    # skl2onnx only converts word-level vectorizers, so n-grams are over words
+    pipeline = Pipeline([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), max_features=2 ** 16)),
+        ("clf", LogisticRegression(max_iter=1000)),
+    ])
+    pipeline.fit(texts, labels)
+    return pipeline
+
+def export_model(pipeline, output_path):
+    """Convert the pipeline to ONNX with a single string input"""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import StringTensorType
+
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=[("input", StringTensorType([None, 1]))],
+        options={id(pipeline.named_steps["clf"]): {"zipmap": False}},
+    )
+    with open(output_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+def main():
+    """Main training function"""
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+
+    csv_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else "category_model.onnx"
+
+    texts, labels = load_receipts(csv_path)
+    if len(set(labels)) < 2:
+        print("❌ Need labeled receipts for at least two categories")
+        return 1
+
+    print(f"🔨 Training on {len(texts)} receipts ({len(set(labels))} categories)...")
+    pipeline = train_model(texts, labels)
+    export_model(pipeline, output_path)
+    print(f"✅ Model written to {output_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())